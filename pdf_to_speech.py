@@ -6,17 +6,43 @@ Converts PDF documents to MP3 audio files using gTTS or pyttsx3.
 
 Author: Kris Armstrong
 """
+
+from __future__ import annotations
+
 import argparse
+import atexit
+import base64
+import contextlib
+import functools
+import hashlib
+import io
+import itertools
 import logging
+import mmap
+import os
+import queue
+import re
+import shutil
 import sys
+import tempfile
+import threading
+import wave
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from importlib.metadata import PackageNotFoundError
 from importlib.metadata import version as _pkg_version
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pyttsx3
-from gtts import gTTS
-from PyPDF2 import PdfReader
+# PDF and TTS libraries are imported where they are used, so that
+# --help/--version and the unused engine do not pay for them.
+if TYPE_CHECKING:
+    import pymupdf
+    import pyttsx3
+    import requests
+    from pypdf import PageObject
 
 
 def _find_pyproject(start: Path) -> Path | None:
@@ -27,6 +53,7 @@ def _find_pyproject(start: Path) -> Path | None:
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def _read_pyproject_version() -> str:
     try:
         import tomllib  # Python 3.11+
@@ -43,14 +70,17 @@ def _read_pyproject_version() -> str:
     return data.get("project", {}).get("version", "0.0.0")
 
 
-_pyproject_version = _read_pyproject_version()
-if _pyproject_version != "0.0.0":
-    __version__ = _pyproject_version
-else:
+def _resolve_version() -> str:
+    # Installed metadata needs no file I/O; pyproject.toml is only for source checkouts.
     try:
-        __version__ = _pkg_version("pdf-to-speech")
+        return _pkg_version("pdf-to-speech")
     except PackageNotFoundError:
-        __version__ = "0.0.0"
+        return _read_pyproject_version()
+
+
+__version__ = _resolve_version()
+
+logger = logging.getLogger(__name__)
 
 
 class Config:
@@ -58,11 +88,34 @@ class Config:
 
     LOG_FILE: str = "pdf_to_speech.log"
     ENCODING: str = "utf-8"
+    PDF_BACKENDS: tuple[str, ...] = ("pymupdf", "pypdf")
+    PDF_BACKEND: str = "pymupdf"
+    PREFETCH_DEPTH: int = 2
+    SLURP_MAX_BYTES: int = 64 * 1024 * 1024
+    TASKS_PER_JOB: int = 4
+    CHUNK_CHARS: int = 500
+    TTS_WORKERS: int = 8
+    TTS_URL: str = "https://translate.google.com/_/TranslateWebserverUi/data/batchexecute"
+    HTTP_POOL_SIZE: int = 16
+    HTTP_TIMEOUT: tuple[float, float] = (3, 10)
+    LANG: str = "en"
+    CACHE_NAME: str = "pdf_to_speech"
+
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_SIMPLE_FONT_TYPES = frozenset({"Type1", "MMType1", "TrueType"})
+_TTS_AUDIO_RE = re.compile(rb'jQ1olc","\[\\"(.*)\\"]')
+_WS_TABLE = str.maketrans(dict.fromkeys("\n\r\t\f\v", " "))
+_WS_RE = re.compile(r" {2,}")
 
 
 def setup_logging(verbose: bool, logfile: str = Config.LOG_FILE) -> None:
     """Configure logging with rotating file handler.
 
+    Records are handed to a queue and written by a background listener
+    thread, so logging calls never block on file or console I/O. Does nothing
+    if the root logger already has handlers.
+
     Args:
         verbose: Enable DEBUG level logging if True.
         logfile: Path to log file.
@@ -70,14 +123,38 @@ def setup_logging(verbose: bool, logfile: str = Config.LOG_FILE) -> None:
     Raises:
         PermissionError: If log file cannot be written.
     """
-    logging.basicConfig(
-        level=logging.DEBUG if verbose else logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            RotatingFileHandler(logfile, maxBytes=1048576, backupCount=3),
-            logging.StreamHandler(),
-        ],
-    )
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    handlers = [
+        RotatingFileHandler(logfile, maxBytes=1048576, backupCount=3),
+        logging.StreamHandler(),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(-1)
+    listener = QueueListener(log_queue, *handlers)
+    root.setLevel(logging.DEBUG if verbose else logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
+
+
+def _positive_int(value: str) -> int:
+    """Argparse type for integers greater than zero."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be an integer, got {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def _default_cache_dir() -> str:
+    """Return the default cache location; ``~`` is expanded only when caching."""
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or "~/.cache", Config.CACHE_NAME)
 
 
 def parse_args() -> argparse.Namespace:
@@ -98,94 +175,649 @@ def parse_args() -> argparse.Namespace:
         default="gtts",
         help="Text-to-speech engine (gtts requires internet)",
     )
+    parser.add_argument(
+        "--pdf-backend",
+        choices=Config.PDF_BACKENDS,
+        default=Config.PDF_BACKEND,
+        help="PDF text extraction backend (pymupdf is considerably faster)",
+    )
+    parser.add_argument(
+        "--fast-extract",
+        action="store_true",
+        help="Always use the reduced pymupdf text flags instead of probing the first page",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=1,
+        help="Processes used for PDF text extraction",
+    )
+    parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=Config.TTS_WORKERS,
+        help="Concurrent gTTS requests",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=_default_cache_dir(),
+        help="Directory for cached MP3 output",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Disable the MP3 cache")
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
     parser.add_argument("--logfile", default=Config.LOG_FILE, help="Log file path")
     parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
     return parser.parse_args()
 
 
-def extract_pdf_text(input_file: str) -> str:
-    """Extract text from a PDF file.
+def _slurp_pdf(input_file: str) -> bytes | None:
+    """Read a PDF into memory in one call if it is small enough.
+
+    PDF parsers seek around the file a lot; serving those seeks from memory
+    avoids many small reads.
 
     Args:
         input_file: Path to PDF file.
 
     Returns:
-        Extracted text as a string.
+        File contents, or None if the file exceeds ``Config.SLURP_MAX_BYTES``.
 
     Raises:
         FileNotFoundError: If input file doesn't exist.
         PermissionError: If input file cannot be read.
     """
-    logging.info("Reading PDF file: %s", input_file)
+    with open(input_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size > Config.SLURP_MAX_BYTES:
+            return None
+        return f.read()
+
+
+def _pypdf_may_have_text(page: PageObject) -> bool:
+    """Cheaply rule out pages that cannot contain text, such as scanned images.
+
+    Text requires a font, so a page qualifies only if it has a content stream
+    and either declares fonts or uses a non-image XObject that might.
+    """
+    if page.get("/Contents") is None:
+        return False
+    resources = page.get("/Resources")
+    if resources is None:
+        return False
+    resources = resources.get_object()
+    if "/Font" in resources:
+        return True
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return False
+    return any(
+        xobject.get_object().get("/Subtype") != "/Image"
+        for xobject in xobjects.get_object().values()
+    )
+
+
+def _is_simple_pdf(doc: pymupdf.Document) -> bool:
+    """Probe the first page to see whether the fast text flags are safe.
+
+    The fast flags keep only whitespace preservation, dropping the mediabox
+    clip, ligature preservation and CID placeholders of the default set. For
+    pages that only use simple (non-CID, non-Type3) fonts, whose glyphs map
+    straight to Unicode, the only visible difference is that ligatures are
+    spelled out, which suits speech anyway.
+    """
+    if not doc.page_count:
+        return False
+    fonts = doc[0].get_fonts()
+    return bool(fonts) and all(font[2] in _SIMPLE_FONT_TYPES for font in fonts)
+
+
+def _pymupdf_text_flags(doc: pymupdf.Document, fast: bool | None) -> int:
+    """Return the ``get_text`` flags to use for ``doc``."""
+    import pymupdf
+
+    if fast is None:
+        fast = _is_simple_pdf(doc)
+        logger.debug("Fast text extraction %s by probe", "enabled" if fast else "disabled")
+    return pymupdf.TEXT_PRESERVE_WHITESPACE if fast else pymupdf.TEXTFLAGS_TEXT
+
+
+def _iter_page_range(
+    input_file: str, backend: str, pages: range | None = None, fast: bool | None = None
+) -> Iterator[str]:
+    """Yield the raw text of the selected pages using the given backend.
+
+    Args:
+        input_file: Path to PDF file.
+        backend: One of ``Config.PDF_BACKENDS``.
+        pages: Zero-based page indices to extract, or None for every page.
+        fast: Use reduced PyMuPDF text flags; True forces them, None decides
+            from a probe of the first page, False never uses them.
+
+    Yields:
+        Text of each page, in document order.
+
+    Raises:
+        FileNotFoundError: If input file doesn't exist.
+    """
+    data = _slurp_pdf(input_file)
+    if backend == "pymupdf":
+        import pymupdf
+
+        # Large files are left to MuPDF's own buffered file access.
+        doc = pymupdf.open(input_file) if data is None else pymupdf.open(stream=data)
+        with doc:
+            flags = _pymupdf_text_flags(doc, fast)
+            for i in range(doc.page_count) if pages is None else pages:
+                page = doc[i]
+                # Text needs a font; get_fonts() also covers nested Form XObjects.
+                if not page.get_fonts():
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("page %d skipped (no text)", i)
+                    yield ""
+                else:
+                    yield page.get_text("text", flags=flags)
+        return
+    from pypdf import PdfReader
+
+    with contextlib.ExitStack() as stack:
+        if data is not None:
+            reader = PdfReader(io.BytesIO(data))
+        else:
+            f = stack.enter_context(open(input_file, "rb"))
+            reader = PdfReader(
+                stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            )
+        for i in range(len(reader.pages)) if pages is None else pages:
+            page = reader.pages[i]
+            if not _pypdf_may_have_text(page):
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("page %d skipped (no text)", i)
+                yield ""
+            else:
+                yield page.extract_text() or ""
+
+
+def _extract_page_range(
+    input_file: str, backend: str, start: int, stop: int, fast: bool | None = None
+) -> list[str]:
+    """Process-pool task: return the raw text of pages ``start`` to ``stop``."""
+    return list(_iter_page_range(input_file, backend, range(start, stop), fast))
+
+
+def _count_pages(input_file: str, backend: str) -> int:
+    """Return the number of pages in a PDF."""
+    if backend == "pymupdf":
+        import pymupdf
+
+        with pymupdf.open(input_file) as doc:
+            return doc.page_count
+    from pypdf import PdfReader
+
+    return len(PdfReader(input_file).pages)
+
+
+def _iter_page_text(
+    input_file: str, backend: str, jobs: int = 1, fast: bool | None = None
+) -> Iterator[str]:
+    """Yield the raw text of each page using the selected backend.
+
+    With ``jobs`` greater than one, contiguous page ranges are extracted in
+    separate processes and yielded back in document order. Log records from
+    the worker processes are not forwarded, so per-page debug messages
+    (skipped pages, the fast-extract probe) are lost in that mode.
+
+    Args:
+        input_file: Path to PDF file.
+        backend: One of ``Config.PDF_BACKENDS``.
+        jobs: Number of extraction processes.
+        fast: Use reduced PyMuPDF text flags; True forces them, None decides
+            from a probe of the first page, False never uses them.
+
+    Yields:
+        Text of each page, in document order.
+
+    Raises:
+        FileNotFoundError: If input file doesn't exist.
+        ValueError: If backend is unknown.
+    """
+    if backend not in Config.PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {backend}")
+    if jobs <= 1:
+        yield from _iter_page_range(input_file, backend, fast=fast)
+        return
+    # pymupdf raises its own RuntimeError subclass for missing files.
+    if not Path(input_file).exists():
+        raise FileNotFoundError(f"No such file: '{input_file}'")
+    count = _count_pages(input_file, backend)
+    step = max(1, -(-count // (jobs * Config.TASKS_PER_JOB)))
+    starts = range(0, count, step)
+    stops = [min(start + step, count) for start in starts]
+    extract = functools.partial(_extract_page_range, input_file, backend, fast=fast)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Keep one range in flight per process so finished text waiting for
+        # the consumer never grows beyond a window of ranges.
+        pending: deque[Future[list[str]]] = deque()
+        try:
+            for start, stop in zip(starts, stops, strict=True):
+                pending.append(executor.submit(extract, start, stop))
+                if len(pending) >= jobs:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+
+def iter_pdf_text(
+    input_file: str, backend: str = Config.PDF_BACKEND, jobs: int = 1, fast: bool | None = None
+) -> Iterator[str]:
+    """Extract text from a PDF file one page at a time.
+
+    Pages without any text are skipped.
+
+    Args:
+        input_file: Path to PDF file.
+        backend: PDF extraction backend (``pymupdf`` or ``pypdf``).
+        jobs: Number of extraction processes.
+        fast: Use reduced PyMuPDF text flags; True forces them, None decides
+            from a probe of the first page, False never uses them.
+
+    Yields:
+        Cleaned text of each non-empty page.
+
+    Raises:
+        FileNotFoundError: If input file doesn't exist.
+        PermissionError: If input file cannot be read.
+    """
+    logger.info("Reading PDF file with %s: %s", backend, input_file)
     try:
-        with open(input_file, "rb") as f:
-            pdf_reader = PdfReader(f)
-            text = ""
-            for page in pdf_reader.pages:
-                page_text = page.extract_text() or ""
-                text += page_text
-            clean_text = text.replace("\n", " ").strip()
-            logging.debug("Extracted text length: %d characters", len(clean_text))
-            return clean_text
+        for page_text in _iter_page_text(input_file, backend, jobs, fast):
+            clean_text = _WS_RE.sub(" ", page_text.translate(_WS_TABLE)).strip()
+            if clean_text:
+                yield clean_text
     except FileNotFoundError:
-        logging.error("Input file not found: %s", input_file)
+        logger.error("Input file not found: %s", input_file)
         raise
     except PermissionError as e:
-        logging.error("Cannot read input file %s: %s", input_file, e)
+        logger.error("Cannot read input file %s: %s", input_file, e)
         raise
     except Exception as e:
-        logging.error("Error extracting text from PDF: %s", e)
+        logger.error("Error extracting text from PDF: %s", e)
         raise
 
 
-def google_text_to_speech(text: str, output_file: str) -> None:
-    """Convert text to speech using gTTS and save as MP3.
+def extract_pdf_text(
+    input_file: str, backend: str = Config.PDF_BACKEND, jobs: int = 1, fast: bool | None = None
+) -> str:
+    """Extract text from a PDF file.
 
     Args:
-        text: Text to convert.
+        input_file: Path to PDF file.
+        backend: PDF extraction backend (``pymupdf`` or ``pypdf``).
+        jobs: Number of extraction processes.
+        fast: Use reduced PyMuPDF text flags; True forces them, None decides
+            from a probe of the first page, False never uses them.
+
+    Returns:
+        Extracted text as a string.
+
+    Raises:
+        FileNotFoundError: If input file doesn't exist.
+        PermissionError: If input file cannot be read.
+    """
+    clean_text = " ".join(iter_pdf_text(input_file, backend, jobs, fast))
+    logger.debug("Extracted text length: %d characters", len(clean_text))
+    return clean_text
+
+
+def _prefetch(items: Iterable[str], depth: int = Config.PREFETCH_DEPTH) -> Iterator[str]:
+    """Consume ``items`` in a background thread, keeping up to ``depth`` ready.
+
+    This lets the next page be extracted while the current one is synthesized.
+
+    Args:
+        items: Iterable to consume.
+        depth: Maximum number of buffered items.
+
+    Yields:
+        Items in their original order.
+    """
+    buffer: queue.Queue[object] = queue.Queue(maxsize=depth)
+    done = object()
+
+    def produce() -> None:
+        try:
+            for item in items:
+                buffer.put(item)
+            buffer.put(done)
+        except Exception as e:
+            buffer.put(e)
+
+    threading.Thread(target=produce, name="pdf-extract", daemon=True).start()
+    while True:
+        item = buffer.get()
+        if item is done:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def _iter_sentences(pages: Iterable[str], max_chars: int) -> Iterator[str]:
+    """Yield the sentences of each page, splitting overlong ones into words."""
+    for page in pages:
+        for sentence in _SENTENCE_RE.split(page):
+            if len(sentence) <= max_chars:
+                if sentence:
+                    yield sentence
+            else:
+                yield from sentence.split()
+
+
+def iter_text_chunks(pages: Iterable[str], max_chars: int = Config.CHUNK_CHARS) -> Iterator[str]:
+    """Greedily pack sentences into chunks of at most ``max_chars`` characters.
+
+    Chunks break at sentence boundaries; a sentence longer than ``max_chars``
+    is broken between words instead, so no chunk ever splits a word. Only a
+    single word longer than ``max_chars`` yields an oversized chunk.
+
+    Args:
+        pages: Cleaned page texts, in document order.
+        max_chars: Maximum chunk length.
+
+    Yields:
+        Text chunks in document order.
+    """
+    chunk = ""
+    for piece in _iter_sentences(pages, max_chars):
+        if chunk and len(chunk) + 1 + len(piece) > max_chars:
+            yield chunk
+            chunk = piece
+        else:
+            chunk = f"{chunk} {piece}" if chunk else piece
+    if chunk:
+        yield chunk
+
+
+def _blake2b_128() -> hashlib.blake2b:
+    """Return a 128-bit BLAKE2b hasher for cache keys."""
+    return hashlib.blake2b(digest_size=16)
+
+
+def document_cache_key(input_file: str, engine: str, backend: str, fast: bool | None = None) -> str:
+    """Build the cache key for a PDF converted with the given settings.
+
+    Args:
+        input_file: Path to PDF file.
+        engine: Text-to-speech engine name.
+        backend: PDF extraction backend name.
+        fast: Fast-extraction setting, as passed to ``iter_pdf_text``.
+
+    Returns:
+        Key combining a hash of the PDF contents with the settings.
+
+    Raises:
+        FileNotFoundError: If input file doesn't exist.
+    """
+    with open(input_file, "rb") as f:
+        digest = hashlib.file_digest(f, _blake2b_128).hexdigest()
+    return f"{digest}-{engine}-{backend}{'-fast' if fast else ''}-{Config.LANG}"
+
+
+def _prepare_cache_dir(path: Path) -> Path:
+    """Create ``path`` private to the current user and return it.
+
+    Raises:
+        PermissionError: If the directory is owned by another user, whose
+            files could otherwise be served as cached audio.
+    """
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if hasattr(os, "getuid") and path.stat().st_uid != os.getuid():
+        raise PermissionError(f"Cache directory not owned by current user: {path}")
+    return path
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` so concurrent readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp:
+        tmp.write(data)
+    os.replace(tmp.name, path)
+
+
+def _copy_atomic(src: str, path: Path) -> None:
+    """Copy ``src`` to ``path`` in blocks, like ``_write_atomic`` but without a full read."""
+    with (
+        open(src, "rb") as f,
+        tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp,
+    ):
+        shutil.copyfileobj(f, tmp)
+    os.replace(tmp.name, path)
+
+
+class _NoAudioError(Exception):
+    """The TTS endpoint answered without an audio payload."""
+
+
+@functools.lru_cache(maxsize=1)
+def _session() -> requests.Session:
+    """Return the shared HTTP session, so TLS connections are reused across chunks."""
+    import requests
+    from gtts import gTTS
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=Config.HTTP_POOL_SIZE, pool_maxsize=Config.HTTP_POOL_SIZE
+    )
+    session.mount("https://", adapter)
+    session.headers.update(gTTS.GOOGLE_TTS_HEADERS)
+    return session
+
+
+def _fetch_tts_audio(bodies: Iterable[str]) -> bytes:
+    """Post gTTS-built request bodies to the TTS endpoint and decode the MP3.
+
+    gTTS still prepares the text (pre-processing and splitting into parts the
+    API accepts); only the transport goes through the pooled session.
+
+    Args:
+        bodies: Request bodies from ``gTTS.get_bodies()``.
+
+    Returns:
+        MP3 bytes for all parts, in order.
+
+    Raises:
+        requests.HTTPError: If the endpoint returns an error status.
+        _NoAudioError: If a response carries no audio.
+    """
+    session = _session()
+    parts = []
+    for body in bodies:
+        response = session.post(Config.TTS_URL, data=body, timeout=Config.HTTP_TIMEOUT)
+        response.raise_for_status()
+        match = _TTS_AUDIO_RE.search(response.content)
+        if match is None:
+            raise _NoAudioError(f"No audio in TTS response ({response.status_code})")
+        parts.append(base64.b64decode(match.group(1)))
+    return b"".join(parts)
+
+
+def _synth_chunk(chunk: str, cache_dir: Path | None = None) -> bytes:
+    """Synthesize one chunk with gTTS and return the MP3 bytes.
+
+    Args:
+        chunk: Text to convert.
+        cache_dir: Directory of per-chunk MP3s to reuse, or None to disable.
+
+    Returns:
+        MP3 bytes for the chunk.
+    """
+    cached = None
+    if cache_dir is not None:
+        key = hashlib.blake2b(f"{Config.LANG}\0{chunk}".encode(), digest_size=16).hexdigest()
+        cached = cache_dir / f"{key}.mp3"
+        try:
+            return cached.read_bytes()
+        except FileNotFoundError:
+            pass
+    import requests
+    from gtts import gTTS
+
+    tts = gTTS(chunk, lang=Config.LANG)
+    try:
+        audio = _fetch_tts_audio(tts.get_bodies())
+    except (requests.RequestException, _NoAudioError) as e:
+        logger.warning("Direct TTS request failed, retrying with gTTS: %s", e)
+        buffer = io.BytesIO()
+        tts.write_to_fp(buffer)
+        audio = buffer.getvalue()
+    if cached is not None:
+        try:
+            _write_atomic(cached, audio)
+        except OSError as e:
+            logger.warning("Cannot write chunk cache %s: %s", cached, e)
+    return audio
+
+
+def google_text_to_speech_stream(
+    chunks: Iterable[str],
+    output_file: str,
+    workers: int = Config.TTS_WORKERS,
+    cache_dir: Path | None = None,
+) -> None:
+    """Convert text chunks to speech using gTTS, appending each to one MP3.
+
+    Chunks are synthesized concurrently by ``workers`` threads and written in
+    their original order; MP3 frames concatenate cleanly, so each result goes
+    to disk as soon as every chunk before it is done.
+
+    Args:
+        chunks: Text chunks to convert, in playback order.
         output_file: Path to output MP3 file.
+        workers: Number of concurrent gTTS requests.
+        cache_dir: Directory of per-chunk MP3s to reuse, or None to disable.
 
     Raises:
         PermissionError: If output file cannot be written.
         Exception: If gTTS fails (e.g., network issues).
     """
-    logging.info("Converting text to speech with gTTS: %s", output_file)
+    logger.info("Converting text to speech with gTTS (%d workers): %s", workers, output_file)
     try:
-        tts = gTTS(text, lang="en")
-        tts.save(output_file)
-        logging.info("MP3 file written: %s", output_file)
+        with (
+            open(output_file, "wb") as f,
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gtts") as executor,
+        ):
+            # Bound the number of in-flight chunks so input is still consumed lazily.
+            pending: deque[Future[bytes]] = deque()
+            try:
+                for chunk in chunks:
+                    pending.append(executor.submit(_synth_chunk, chunk, cache_dir))
+                    if len(pending) >= 2 * workers:
+                        f.write(pending.popleft().result())
+                while pending:
+                    f.write(pending.popleft().result())
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        logger.info("MP3 file written: %s", output_file)
     except PermissionError as e:
-        logging.error("Cannot write to output file %s: %s", output_file, e)
+        logger.error("Cannot write to output file %s: %s", output_file, e)
         raise
     except Exception as e:
-        logging.error("gTTS conversion failed: %s", e)
+        logger.error("gTTS conversion failed: %s", e)
         raise
 
 
-def pyttsx3_text_to_speech(text: str, output_file: str) -> None:
-    """Convert text to speech using pyttsx3 and save as MP3.
+def google_text_to_speech(text: str, output_file: str) -> None:
+    """Convert text to speech using gTTS and save as MP3.
 
     Args:
         text: Text to convert.
         output_file: Path to output MP3 file.
 
+    Raises:
+        PermissionError: If output file cannot be written.
+        Exception: If gTTS fails (e.g., network issues).
+    """
+    google_text_to_speech_stream([text], output_file)
+
+
+@functools.lru_cache(maxsize=1)
+def _engine() -> pyttsx3.Engine:
+    """Return the process-wide pyttsx3 engine, initializing its driver once."""
+    import pyttsx3
+
+    return pyttsx3.init()
+
+
+def _splice_wav(out: wave.Wave_write | None, part: Path, output_file: str) -> wave.Wave_write:
+    """Append the frames of ``part`` to ``out``, opening ``output_file`` on first use.
+
+    Raises:
+        wave.Error: If ``part`` is not a WAV file.
+        EOFError: If ``part`` is truncated or not a WAV file.
+    """
+    with wave.open(str(part), "rb") as src:
+        if out is None:
+            out = wave.open(output_file, "wb")
+            out.setparams(src.getparams())
+        out.writeframes(src.readframes(src.getnframes()))
+    part.unlink()
+    return out
+
+
+def pyttsx3_text_to_speech(chunks: str | Iterable[str], output_file: str) -> None:
+    """Convert text to speech using pyttsx3 and save to ``output_file``.
+
+    Each chunk is synthesized on one shared engine to a temporary file, which
+    is spliced into the output before the next chunk is queued. Drivers that
+    do not write WAV (NSSpeechSynthesizer writes AIFF) cannot be spliced with
+    the standard library; for those the text is synthesized in one go.
+
+    Args:
+        chunks: Text, or text chunks in playback order.
+        output_file: Path to output audio file.
+
     Raises:
         PermissionError: If output file cannot be written.
         Exception: If pyttsx3 fails.
     """
-    logging.info("Converting text to speech with pyttsx3: %s", output_file)
+    logger.info("Converting text to speech with pyttsx3: %s", output_file)
+    if isinstance(chunks, str):
+        chunks = [chunks]
+    chunks = iter(chunks)
     try:
-        engine = pyttsx3.init()
-        engine.save_to_file(text, output_file)
-        engine.runAndWait()
+        engine = _engine()
+        with tempfile.TemporaryDirectory(prefix="pdf_to_speech-") as tmp:
+            out: wave.Wave_write | None = None
+            part = Path(tmp) / "part.wav"
+            try:
+                for chunk in chunks:
+                    # espeak synthesizes only the last save_to_file queued
+                    # before runAndWait, so drive the loop once per chunk.
+                    engine.save_to_file(chunk, str(part))
+                    engine.runAndWait()
+                    try:
+                        out = _splice_wav(out, part, output_file)
+                    except (wave.Error, EOFError):
+                        if out is not None:
+                            raise
+                        engine.save_to_file(" ".join((chunk, *chunks)), output_file)
+                        engine.runAndWait()
+            finally:
+                if out is not None:
+                    out.close()
         engine.stop()
-        logging.info("MP3 file written: %s", output_file)
+        logger.info("Audio file written: %s", output_file)
     except PermissionError as e:
-        logging.error("Cannot write to output file %s: %s", output_file, e)
+        logger.error("Cannot write to output file %s: %s", output_file, e)
         raise
     except Exception as e:
-        logging.error("pyttsx3 conversion failed: %s", e)
+        logger.error("pyttsx3 conversion failed: %s", e)
         raise
 
 
@@ -200,25 +832,57 @@ def main() -> int:
 
     # Validate output file extension
     if not args.output_file.lower().endswith(".mp3"):
-        logging.error("Output file must have .mp3 extension")
+        logger.error("Output file must have .mp3 extension")
         return 1
 
+    # Without --fast-extract, let the first-page probe decide.
+    fast = True if args.fast_extract else None
     try:
-        clean_text = extract_pdf_text(args.input_file)
-        if not clean_text:
-            logging.error("No text extracted from PDF")
+        cache_file = chunk_cache = None
+        if not args.no_cache:
+            # The cache is an optimization: if it cannot be set up, convert without it.
+            try:
+                cache_dir = _prepare_cache_dir(args.cache_dir.expanduser())
+                if args.engine == "gtts":
+                    chunk_cache = _prepare_cache_dir(cache_dir / "chunks")
+            except (OSError, RuntimeError) as e:
+                logger.warning("Cache disabled: %s", e)
+            else:
+                key = document_cache_key(args.input_file, args.engine, args.pdf_backend, fast)
+                cache_file = cache_dir / f"{key}.mp3"
+                if cache_file.is_file():
+                    logger.info("Using cached audio: %s", cache_file)
+                    shutil.copyfile(cache_file, args.output_file)
+                    return 0
+
+        pages = _prefetch(iter_pdf_text(args.input_file, args.pdf_backend, args.jobs, fast))
+        first_page = next(pages, None)
+        if first_page is None:
+            logger.error("No text extracted from PDF")
             return 1
+        pages = itertools.chain((first_page,), pages)
 
         if args.engine == "gtts":
-            google_text_to_speech(clean_text, args.output_file)
+            google_text_to_speech_stream(
+                iter_text_chunks(pages),
+                args.output_file,
+                args.workers,
+                chunk_cache,
+            )
         else:
-            pyttsx3_text_to_speech(clean_text, args.output_file)
+            pyttsx3_text_to_speech(pages, args.output_file)
+
+        if cache_file is not None:
+            try:
+                _copy_atomic(args.output_file, cache_file)
+            except OSError as e:
+                logger.warning("Cannot write cache %s: %s", cache_file, e)
         return 0
     except KeyboardInterrupt:
-        logging.info("Cancelled by user")
+        logger.info("Cancelled by user")
         return 0
     except Exception as e:
-        logging.error("Error: %s", e)
+        logger.error("Error: %s", e)
         return 1
 
 
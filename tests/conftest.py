@@ -0,0 +1,64 @@
+"""
+Shared fixtures for PdfToSpeech tests.
+
+The PDFs are only ever read, so each is built once per session.
+"""
+
+import pymupdf
+import pytest
+from pypdf import PdfWriter
+
+
+@pytest.fixture(scope="session")
+def pdf_file(tmp_path_factory):
+    """Create a blank one-page PDF shared by the whole session."""
+    pdf_path = tmp_path_factory.mktemp("pdf") / "test.pdf"
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    with open(pdf_path, "wb") as f:
+        writer.write(f)
+    return pdf_path
+
+
+@pytest.fixture(scope="session")
+def text_pdf_file(tmp_path_factory):
+    """Create a PDF with text on the first and last of three pages."""
+    pdf_path = tmp_path_factory.mktemp("pdf") / "text.pdf"
+    doc = pymupdf.open()
+    for text in ("First page.", "", "Third page."):
+        page = doc.new_page(width=200, height=200)
+        if text:
+            page.insert_text((20, 50), text)
+    doc.save(pdf_path)
+    doc.close()
+    return pdf_path
+
+
+@pytest.fixture(scope="session")
+def mixed_pdf_file(tmp_path_factory):
+    """Create a PDF with an image-only page and a page whose text is in a Form XObject."""
+    pdf_path = tmp_path_factory.mktemp("pdf") / "mixed.pdf"
+    inner = pymupdf.open()
+    inner.new_page(width=200, height=200).insert_text((20, 50), "Nested text.")
+    doc = pymupdf.open()
+    pixmap = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 8, 8))
+    pixmap.clear_with(255)
+    scanned = doc.new_page(width=200, height=200)
+    scanned.insert_image(scanned.rect, pixmap=pixmap)
+    page = doc.new_page(width=200, height=200)
+    page.show_pdf_page(page.rect, inner, 0)
+    doc.save(pdf_path)
+    doc.close()
+    inner.close()
+    return pdf_path
+
+
+@pytest.fixture(scope="session")
+def cid_pdf_file(tmp_path_factory):
+    """Create a PDF whose text uses a CID-keyed (Type0) font."""
+    pdf_path = tmp_path_factory.mktemp("pdf") / "cid.pdf"
+    doc = pymupdf.open()
+    doc.new_page(width=200, height=200).insert_text((20, 50), "Hello.", fontname="china-s")
+    doc.save(pdf_path)
+    doc.close()
+    return pdf_path
@@ -2,24 +2,113 @@
 """
 Tests for PdfToSpeech.
 """
+
+import base64
+import logging
+import os
+import subprocess
+import sys
+import wave
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
-from PyPDF2 import PdfWriter
+import requests
 
-from pdf_to_speech import __version__, extract_pdf_text
+import pdf_to_speech
+from pdf_to_speech import (
+    __version__,
+    extract_pdf_text,
+    google_text_to_speech_stream,
+    iter_pdf_text,
+    iter_text_chunks,
+    pyttsx3_text_to_speech,
+)
 
+UNPATCHED_SESSION = pdf_to_speech._session
+
+
+class FakeTTS:
+    """Stand-in for gTTS that writes the text instead of audio."""
+
+    def __init__(self, text: str, lang: str = "en") -> None:
+        self.text = text
+
+    def get_bodies(self) -> list[str]:
+        return [self.text]
+
+    def write_to_fp(self, fp) -> None:
+        fp.write(f"[{self.text}]".encode())
+
+
+class FakeSession:
+    """Stand-in for the pooled TTS session; echoes each body back as audio."""
+
+    def __init__(
+        self, status: int = 200, audio: bool = True, error: Exception | None = None
+    ) -> None:
+        self.status = status
+        self.audio = audio
+        self.error = error
+        self.bodies: list[str] = []
+
+    def post(self, url: str, data: str, timeout) -> SimpleNamespace:
+        self.bodies.append(data)
+        if self.error is not None:
+            raise self.error
+        payload = base64.b64encode(f"[{data}]".encode()) if self.audio else b""
+        content = b'[["wrb.fr","jQ1olc","[\\"' + payload + b'\\"]",null]]'
+        if not self.audio:
+            content = b'[["wrb.fr","other",null]]'
+
+        def raise_for_status() -> None:
+            if self.status != 200:
+                raise requests.HTTPError(f"{self.status} Server Error")
+
+        return SimpleNamespace(
+            status_code=self.status, content=content, raise_for_status=raise_for_status
+        )
 
-@pytest.fixture
-def pdf_file(tmp_path):
-    """Create a temporary PDF file."""
-    pdf_path = tmp_path / "test.pdf"
-    output_path = tmp_path / "test.mp3"
-    writer = PdfWriter()
-    writer.add_blank_page(width=72, height=72)
-    with open(pdf_path, "wb") as f:
-        writer.write(f)
-    return pdf_path, output_path
+
+@pytest.fixture(autouse=True)
+def fake_session(monkeypatch):
+    """Keep every test off the network by replacing the pooled TTS session."""
+    session = FakeSession()
+    monkeypatch.setattr(pdf_to_speech, "_session", lambda: session)
+    return session
+
+
+class FakeEngine:
+    """Stand-in for a pyttsx3 engine that writes one frame per character.
+
+    Like the espeak driver, only the last save queued before ``runAndWait`` is
+    synthesized.
+    """
+
+    def __init__(self, wav: bool = True) -> None:
+        self.wav = wav
+        self.queued: list[tuple[str, str]] = []
+        self.spoken: list[str] = []
+
+    def save_to_file(self, text: str, filename: str) -> None:
+        self.queued.append((text, filename))
+
+    def runAndWait(self) -> None:  # noqa: N802 - pyttsx3 API
+        for text, filename in self.queued[-1:]:
+            self.spoken.append(text)
+            if self.wav:
+                with wave.open(filename, "wb") as w:
+                    w.setnchannels(1)
+                    w.setsampwidth(1)
+                    w.setframerate(8000)
+                    w.writeframes(text.encode())
+            else:
+                Path(filename).write_bytes(b"FORM" + text.encode())
+        self.queued.clear()
+
+    def stop(self) -> None:
+        pass
 
 
 def test_version() -> None:
@@ -40,14 +129,345 @@ def test_version() -> None:
     assert __version__ == expected
 
 
-def test_extract_pdf_text(pdf_file) -> None:
+@pytest.mark.parametrize("value", ["abc", "0"])
+def test_jobs_must_be_positive_int(value, monkeypatch, capsys) -> None:
+    """Test that a bad --jobs value is rejected with a readable message."""
+    monkeypatch.setattr("sys.argv", ["pdf_to_speech", "in.pdf", "out.mp3", "--jobs", value])
+    with pytest.raises(SystemExit):
+        pdf_to_speech.parse_args()
+    err = capsys.readouterr().err
+    assert "argument --jobs" in err
+    assert "_positive_int" not in err
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf"])
+def test_extract_pdf_text(pdf_file, backend) -> None:
     """Test extracting text from a PDF."""
-    pdf_path, _ = pdf_file
-    text = extract_pdf_text(str(pdf_path))
+    text = extract_pdf_text(str(pdf_file), backend)
     assert text == ""
 
 
-def test_extract_pdf_text_invalid_file() -> None:
+def test_import_defers_heavy_dependencies() -> None:
+    """Test that importing the module loads no PDF or TTS library."""
+    code = (
+        "import sys, pdf_to_speech; "
+        "print([m for m in ('pymupdf', 'pypdf', 'gtts', 'pyttsx3') if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+        text=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf"])
+def test_extract_pdf_text_invalid_file(backend) -> None:
     """Test extracting text from an invalid PDF."""
     with pytest.raises(FileNotFoundError):
-        extract_pdf_text("nonexistent.pdf")
+        extract_pdf_text("nonexistent.pdf", backend)
+
+
+def test_extract_pdf_text_unknown_backend(pdf_file) -> None:
+    """Test that an unknown backend is rejected."""
+    with pytest.raises(ValueError, match="Unknown PDF backend"):
+        extract_pdf_text(str(pdf_file), "pdfminer")
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf"])
+def test_iter_pdf_text_skips_empty_pages(text_pdf_file, backend) -> None:
+    """Test that pages are yielded one at a time and blank pages skipped."""
+    assert list(iter_pdf_text(str(text_pdf_file), backend)) == ["First page.", "Third page."]
+
+
+@pytest.mark.parametrize("fast", [None, True, False])
+def test_iter_pdf_text_fast_extract(text_pdf_file, fast) -> None:
+    """Test that fast extraction gives the same text on a simple PDF."""
+    pages = list(iter_pdf_text(str(text_pdf_file), fast=fast))
+    assert pages == ["First page.", "Third page."]
+
+
+@pytest.mark.parametrize(
+    ("fixture", "expected"), [("text_pdf_file", "enabled"), ("cid_pdf_file", "disabled")]
+)
+def test_fast_extract_probe(fixture, expected, request, caplog) -> None:
+    """Test that the probe only picks the fast flags for simple fonts."""
+    pdf_path = request.getfixturevalue(fixture)
+    with caplog.at_level(logging.DEBUG):
+        assert list(iter_pdf_text(str(pdf_path)))
+    assert f"Fast text extraction {expected} by probe" in caplog.text
+
+
+def test_iter_pdf_text_normalizes_whitespace(monkeypatch) -> None:
+    """Test that control whitespace is mapped to spaces and runs collapsed."""
+    raw_pages = ["a\r\n\tb\f\vc  d ", " \n "]
+    monkeypatch.setattr(pdf_to_speech, "_iter_page_text", lambda *_: iter(raw_pages))
+    assert list(iter_pdf_text("unused.pdf")) == ["a b c d"]
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf"])
+def test_iter_pdf_text_large_file(text_pdf_file, backend, monkeypatch) -> None:
+    """Test the path for files too large to read into memory at once."""
+    monkeypatch.setattr(pdf_to_speech.Config, "SLURP_MAX_BYTES", 0)
+    assert list(iter_pdf_text(str(text_pdf_file), backend)) == ["First page.", "Third page."]
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf"])
+def test_iter_pdf_text_parallel(text_pdf_file, backend, monkeypatch) -> None:
+    """Test that multi-process extraction keeps document order."""
+    monkeypatch.setattr(pdf_to_speech.Config, "TASKS_PER_JOB", 2)
+    pages = list(iter_pdf_text(str(text_pdf_file), backend, jobs=2))
+    assert pages == ["First page.", "Third page."]
+
+
+def test_iter_pdf_text_parallel_is_bounded(text_pdf_file, monkeypatch) -> None:
+    """Test that page ranges are submitted only as the consumer catches up."""
+    submitted: list[int] = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, start, stop):
+            submitted.append(start)
+            return super().submit(fn, start, stop)
+
+    monkeypatch.setattr(pdf_to_speech, "ProcessPoolExecutor", RecordingExecutor)
+    pages = iter_pdf_text(str(text_pdf_file), jobs=2)
+    assert next(pages) == "First page."
+    assert submitted == [0, 1]
+    assert list(pages) == ["Third page."]
+    assert submitted == [0, 1, 2]
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf"])
+def test_iter_pdf_text_parallel_invalid_file(backend) -> None:
+    """Test that a missing file is reported before workers start."""
+    with pytest.raises(FileNotFoundError):
+        list(iter_pdf_text("nonexistent.pdf", backend, jobs=2))
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf"])
+def test_iter_pdf_text_skips_pages_without_fonts(mixed_pdf_file, backend, caplog) -> None:
+    """Test that image-only pages are skipped without hiding Form XObject text."""
+    with caplog.at_level(logging.DEBUG):
+        pages = list(iter_pdf_text(str(mixed_pdf_file), backend))
+    assert pages == ["Nested text."]
+    assert "page 0 skipped (no text)" in caplog.text
+    assert "page 1 skipped" not in caplog.text
+
+
+def test_google_text_to_speech_stream(tmp_path, monkeypatch) -> None:
+    """Test that each chunk is synthesized and appended in order."""
+    monkeypatch.setattr("gtts.gTTS", FakeTTS)
+    output_path = tmp_path / "out.mp3"
+    google_text_to_speech_stream(iter(["one", "two"]), str(output_path))
+    assert output_path.read_bytes() == b"[one][two]"
+
+
+def test_google_text_to_speech_stream_keeps_order(tmp_path, monkeypatch) -> None:
+    """Test that concurrent synthesis still writes chunks in submission order."""
+    monkeypatch.setattr("gtts.gTTS", FakeTTS)
+    output_path = tmp_path / "out.mp3"
+    chunks = [str(i) for i in range(20)]
+    google_text_to_speech_stream(chunks, str(output_path), workers=4)
+    assert output_path.read_bytes() == b"".join(f"[{c}]".encode() for c in chunks)
+
+
+class RecordingTTS(FakeTTS):
+    """FakeTTS that records which chunks went through gTTS's own transport."""
+
+    fallbacks: list[str] = []
+
+    def write_to_fp(self, fp) -> None:
+        self.fallbacks.append(self.text)
+        super().write_to_fp(fp)
+
+
+def test_synthesis_uses_pooled_session(tmp_path, fake_session, monkeypatch) -> None:
+    """Test that chunks are posted through the shared session, not gTTS."""
+    RecordingTTS.fallbacks = []
+    monkeypatch.setattr("gtts.gTTS", RecordingTTS)
+    output_path = tmp_path / "out.mp3"
+    google_text_to_speech_stream(["one", "two"], str(output_path))
+    assert output_path.read_bytes() == b"[one][two]"
+    assert sorted(fake_session.bodies) == ["one", "two"]
+    assert RecordingTTS.fallbacks == []
+
+
+@pytest.mark.parametrize(
+    "session",
+    [
+        FakeSession(status=500),
+        FakeSession(audio=False),
+        FakeSession(error=requests.ReadTimeout("read timed out")),
+        FakeSession(error=requests.ConnectionError("connection refused")),
+    ],
+)
+def test_synthesis_falls_back_to_gtts(tmp_path, session, monkeypatch) -> None:
+    """Test that request errors or missing audio fall back to plain gTTS."""
+    RecordingTTS.fallbacks = []
+    monkeypatch.setattr("gtts.gTTS", RecordingTTS)
+    monkeypatch.setattr(pdf_to_speech, "_session", lambda: session)
+    output_path = tmp_path / "out.mp3"
+    google_text_to_speech_stream(["one"], str(output_path))
+    assert output_path.read_bytes() == b"[one]"
+    assert RecordingTTS.fallbacks == ["one"]
+
+
+def test_session_pools_connections() -> None:
+    """Test that the shared session mounts a pooled HTTPS adapter."""
+    session = UNPATCHED_SESSION.__wrapped__()
+    adapter = session.get_adapter("https://translate.google.com/")
+    assert adapter._pool_maxsize == pdf_to_speech.Config.HTTP_POOL_SIZE
+
+
+def test_iter_text_chunks() -> None:
+    """Test greedy sentence packing across pages."""
+    pages = ["One. Two three! Four?", "Five."]
+    assert list(iter_text_chunks(pages, max_chars=15)) == ["One. Two three!", "Four? Five."]
+
+
+def test_iter_text_chunks_long_word() -> None:
+    """Test that a single word longer than the limit becomes its own chunk."""
+    pages = ["Short. " + "x" * 30 + ". End."]
+    assert list(iter_text_chunks(pages, max_chars=10)) == ["Short.", "x" * 30 + ".", "End."]
+
+
+def test_iter_text_chunks_long_sentence() -> None:
+    """Test that an overlong sentence is split between words."""
+    pages = ["Hi. alpha beta gamma delta epsilon."]
+    chunks = list(iter_text_chunks(pages, max_chars=12))
+    assert chunks == ["Hi. alpha", "beta gamma", "delta", "epsilon."]
+
+
+def run_main(monkeypatch, tmp_path, *args: str) -> int:
+    """Run the CLI with an isolated log file and cache directory."""
+    argv = ["pdf_to_speech", *args, "--logfile", str(tmp_path / "test.log")]
+    argv += ["--cache-dir", str(tmp_path / "cache")]
+    monkeypatch.setattr("sys.argv", argv)
+    return pdf_to_speech.main()
+
+
+def test_main_streams_pages(text_pdf_file, tmp_path, monkeypatch) -> None:
+    """Test the gTTS pipeline end to end."""
+    monkeypatch.setattr("gtts.gTTS", FakeTTS)
+    output_path = tmp_path / "out.mp3"
+    assert run_main(monkeypatch, tmp_path, str(text_pdf_file), str(output_path)) == 0
+    assert output_path.read_bytes() == b"[First page. Third page.]"
+
+
+def test_main_no_text(pdf_file, tmp_path, monkeypatch) -> None:
+    """Test that a PDF without text is reported as an error."""
+    output_path = tmp_path / "out.mp3"
+    assert run_main(monkeypatch, tmp_path, str(pdf_file), str(output_path)) == 1
+    assert not output_path.exists()
+
+
+def test_main_uses_document_cache(text_pdf_file, tmp_path, monkeypatch) -> None:
+    """Test that a second run of the same PDF is served from the cache."""
+    monkeypatch.setattr("gtts.gTTS", FakeTTS)
+    first = tmp_path / "first.mp3"
+    assert run_main(monkeypatch, tmp_path, str(text_pdf_file), str(first)) == 0
+
+    monkeypatch.setattr("gtts.gTTS", None)
+    second = tmp_path / "second.mp3"
+    assert run_main(monkeypatch, tmp_path, str(text_pdf_file), str(second)) == 0
+    assert second.read_bytes() == first.read_bytes()
+
+
+def test_main_no_cache(text_pdf_file, tmp_path, monkeypatch) -> None:
+    """Test that --no-cache leaves the cache directory untouched."""
+    monkeypatch.setattr("gtts.gTTS", FakeTTS)
+    output_path = tmp_path / "out.mp3"
+    args = (str(text_pdf_file), str(output_path), "--no-cache")
+    assert run_main(monkeypatch, tmp_path, *args) == 0
+    assert not (tmp_path / "cache").exists()
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX ownership")
+def test_main_creates_private_cache(text_pdf_file, tmp_path, monkeypatch) -> None:
+    """Test that the cache directory is created readable by its owner only."""
+    monkeypatch.setattr("gtts.gTTS", FakeTTS)
+    assert run_main(monkeypatch, tmp_path, str(text_pdf_file), str(tmp_path / "out.mp3")) == 0
+    for path in (tmp_path / "cache", tmp_path / "cache" / "chunks"):
+        assert path.stat().st_mode & 0o777 == 0o700
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX ownership")
+def test_main_refuses_foreign_cache(text_pdf_file, tmp_path, monkeypatch) -> None:
+    """Test that a cache directory owned by another user is never read."""
+    monkeypatch.setattr("gtts.gTTS", FakeTTS)
+    key = pdf_to_speech.document_cache_key(str(text_pdf_file), "gtts", "pymupdf", None)
+    planted = tmp_path / "cache" / f"{key}.mp3"
+    planted.parent.mkdir()
+    planted.write_bytes(b"planted")
+    monkeypatch.setattr("os.getuid", lambda: os.stat(tmp_path).st_uid + 1)
+    output_path = tmp_path / "out.mp3"
+    assert run_main(monkeypatch, tmp_path, str(text_pdf_file), str(output_path)) == 0
+    assert output_path.read_bytes() == b"[First page. Third page.]"
+    assert os.listdir(planted.parent) == [planted.name]
+
+
+def test_main_without_usable_cache_dir(text_pdf_file, tmp_path, monkeypatch) -> None:
+    """Test that a default cache location that cannot be created is skipped."""
+    monkeypatch.setattr("gtts.gTTS", FakeTTS)
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    home = tmp_path / "home"
+    home.write_text("not a directory")
+    monkeypatch.setenv("HOME", str(home))
+    output_path = tmp_path / "out.mp3"
+    argv = ["pdf_to_speech", str(text_pdf_file), str(output_path)]
+    monkeypatch.setattr("sys.argv", [*argv, "--logfile", str(tmp_path / "test.log")])
+    assert pdf_to_speech.main() == 0
+    assert output_path.read_bytes() == b"[First page. Third page.]"
+
+
+def test_chunk_cache_is_shared(tmp_path, fake_session, monkeypatch) -> None:
+    """Test that identical chunks are synthesized only once."""
+    monkeypatch.setattr("gtts.gTTS", FakeTTS)
+    cache_dir = tmp_path / "chunks"
+    for name in ("a.mp3", "b.mp3"):
+        google_text_to_speech_stream(["same", "same"], str(tmp_path / name), 1, cache_dir)
+    assert fake_session.bodies == ["same"]
+    assert (tmp_path / "b.mp3").read_bytes() == b"[same][same]"
+
+
+@pytest.fixture
+def fake_engine(monkeypatch):
+    """Install a fake pyttsx3 engine in place of the cached real one."""
+
+    def install(wav: bool = True) -> FakeEngine:
+        engine = FakeEngine(wav)
+        monkeypatch.setitem(sys.modules, "pyttsx3", SimpleNamespace(init=lambda: engine))
+        return engine
+
+    pdf_to_speech._engine.cache_clear()
+    yield install
+    pdf_to_speech._engine.cache_clear()
+
+
+def test_pyttsx3_splices_wav_chunks(tmp_path, fake_engine) -> None:
+    """Test that per-chunk WAV output is spliced into one file."""
+    engine = fake_engine()
+    output_path = tmp_path / "out.mp3"
+    pyttsx3_text_to_speech(iter(["one", "two", "three", "four"]), str(output_path))
+    assert engine.spoken == ["one", "two", "three", "four"]
+    with wave.open(str(output_path), "rb") as w:
+        assert w.readframes(w.getnframes()) == b"onetwothreefour"
+
+
+def test_pyttsx3_reuses_engine(tmp_path, fake_engine) -> None:
+    """Test that the engine is initialized once per process."""
+    engine = fake_engine()
+    pyttsx3_text_to_speech("one", str(tmp_path / "a.mp3"))
+    sys.modules["pyttsx3"].init = None
+    pyttsx3_text_to_speech("two", str(tmp_path / "b.mp3"))
+    assert engine.spoken == ["one", "two"]
+
+
+def test_pyttsx3_non_wav_falls_back(tmp_path, fake_engine) -> None:
+    """Test that drivers writing other containers get the text in one call."""
+    fake_engine(wav=False)
+    output_path = tmp_path / "out.mp3"
+    pyttsx3_text_to_speech(iter(["one", "two", "three"]), str(output_path))
+    assert output_path.read_bytes() == b"FORMone two three"